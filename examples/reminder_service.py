@@ -7,67 +7,242 @@ invoked so the caller can update a display and trigger speech synthesis.
 
 The service is designed to be embedded into the existing XiaoZhi AI chatbot
 software stack, but it can also run standalone for demonstration or unit tests.
+It requires Python 3.10 or newer (``Reminder`` is a slotted dataclass).
 """
 
 from __future__ import annotations
 
 import dataclasses
 import datetime as dt
+import functools
+import heapq
+import itertools
 import json
+import os
 import re
 import threading
 import time
 import uuid
 from pathlib import Path
-from typing import Callable, Iterable, List, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
 
+_PREFIX = "nhắc nhở tôi"
+_MAX_COMMAND_LENGTH = 512
+_LUC_RE = re.compile(r"\blúc\b", re.IGNORECASE)
+_fromisoformat = dt.datetime.fromisoformat
 
-@dataclasses.dataclass(order=True)
-class Reminder:
-    """Represents a scheduled reminder."""
+try:
+    import orjson
+
+    def _dumps(payload: object) -> bytes:
+        return orjson.dumps(payload)
+
+    _loads = orjson.loads
+except ImportError:  # pragma: no cover - orjson is an optional speedup
+
+    def _dumps(payload: object) -> bytes:
+        return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    _loads = json.loads
+
+
+class _SerializedCache:
+    """Slot holding a reminder's cached serialized form outside the dataclass fields."""
+
+    __slots__ = ("_json",)
+
+
+@dataclasses.dataclass(order=True, frozen=True, slots=True)
+class Reminder(_SerializedCache):
+    """Represents a scheduled reminder.
+
+    Reminders are immutable once created, which lets the serialized form be
+    computed once and reused by every subsequent write to the store.
+    """
 
     due_time: dt.datetime
     message: str = dataclasses.field(compare=False)
     identifier: str = dataclasses.field(default_factory=lambda: uuid.uuid4().hex, compare=False)
     created_at: dt.datetime = dataclasses.field(default_factory=dt.datetime.now, compare=False)
 
+    def _serialized(self) -> dict:
+        """Return the cached serialized form; shared, so only the store may use it."""
+
+        try:
+            return self._json
+        except AttributeError:
+            cached = {
+                "due_time": self.due_time.isoformat(),
+                "message": self.message,
+                "identifier": self.identifier,
+                "created_at": self.created_at.isoformat(),
+            }
+            object.__setattr__(self, "_json", cached)
+            return cached
+
     def to_json(self) -> dict:
-        return {
-            "due_time": self.due_time.isoformat(),
-            "message": self.message,
-            "identifier": self.identifier,
-            "created_at": self.created_at.isoformat(),
-        }
+        return dict(self._serialized())
 
     @classmethod
     def from_json(cls, payload: dict) -> "Reminder":
         return cls(
-            due_time=dt.datetime.fromisoformat(payload["due_time"]),
+            due_time=_fromisoformat(payload["due_time"]),
             message=payload["message"],
             identifier=payload["identifier"],
-            created_at=dt.datetime.fromisoformat(payload["created_at"]),
+            created_at=_fromisoformat(payload["created_at"]),
         )
 
 
+def _encode_snapshot(reminders: Iterable[Reminder]) -> Tuple[bytes, int]:
+    """Encode reminders as a compacted log of ``add`` records; returns the bytes and record count."""
+
+    lines = [_dumps({"op": "add", "reminder": reminder._serialized()}) + b"\n" for reminder in reminders]
+    return b"".join(lines), len(lines)
+
+
+def _decode_record(line: bytes) -> dict:
+    """Decode one log line, raising ``ValueError`` unless it is a well-formed record."""
+
+    record = _loads(line)
+    if not isinstance(record, dict):
+        raise ValueError("log record is not an object")
+    op = record.get("op")
+    if op == "add":
+        if not isinstance(record.get("reminder"), dict) or "identifier" not in record["reminder"]:
+            raise ValueError("add record without a reminder")
+    elif op in ("del", "fire"):
+        if "id" not in record:
+            raise ValueError(f"{op} record without an id")
+    else:
+        raise ValueError(f"unknown log op {op!r}")
+    return record
+
+
 class ReminderStore:
-    """Persists reminders as JSON on disk."""
+    """Persists reminders as an append-only JSON lines log on disk.
+
+    Every mutation appends a single ``add``, ``del`` or ``fire`` record, so the
+    cost of a write does not grow with the number of stored reminders. The log is
+    replayed on :meth:`load` and rewritten by :meth:`compact` once dead records
+    outnumber the live reminders.
+    """
 
     def __init__(self, storage_path: Path):
         self._storage_path = storage_path
         self._storage_path.parent.mkdir(parents=True, exist_ok=True)
         self._lock = threading.Lock()
+        self._records = 0
+        self._live = 0
 
     def load(self) -> List[Reminder]:
         with self._lock:
-            if not self._storage_path.exists():
-                return []
-            data = json.loads(self._storage_path.read_text(encoding="utf-8"))
-        return [Reminder.from_json(item) for item in data]
+            reminders = self._replay()
+        return list(reminders.values())
+
+    def append(self, reminder: Reminder) -> None:
+        self._write_record({"op": "add", "reminder": reminder._serialized()}, live_delta=1)
+
+    def remove(self, identifier: str) -> None:
+        self._write_record({"op": "del", "id": identifier}, live_delta=-1)
+
+    def mark_fired(self, identifier: str) -> None:
+        self._write_record({"op": "fire", "id": identifier}, live_delta=-1)
+
+    def compact(self) -> None:
+        """Rewrite the log when it holds more than twice as many records as live reminders."""
+
+        with self._lock:
+            if self._records <= 2 * self._live:
+                return
+            reminders = self._replay()
+            self._rewrite(*_encode_snapshot(reminders.values()))
 
     def save(self, reminders: Iterable[Reminder]) -> None:
+        # Encode before taking the lock so only the file write is serialised.
+        data, count = _encode_snapshot(reminders)
+        with self._lock:
+            self._rewrite(data, count)
+
+    def _replay(self) -> Dict[str, Reminder]:
+        data = self._storage_path.read_bytes() if self._storage_path.exists() else b""
+        if data.lstrip().startswith(b"["):
+            return self._migrate_legacy(data)
+
+        payloads: Dict[str, dict] = {}
+        records = 0
+        torn = False
+        lines = data.split(b"\n")
+        last = max((index for index, line in enumerate(lines) if line.strip()), default=-1)
+        for index, line in enumerate(lines):
+            if not line.strip():
+                continue
+            try:
+                record = _decode_record(line)
+            except ValueError as exc:
+                if index != last:
+                    raise ValueError(
+                        f"Bản ghi nhắc nhở hỏng ở dòng {index + 1} của {self._storage_path}."
+                    ) from exc
+                # A torn final line from a crash mid-append; everything before it is intact.
+                torn = True
+                break
+            records += 1
+            if record["op"] == "add":
+                payloads[record["reminder"]["identifier"]] = record["reminder"]
+            else:
+                payloads.pop(record["id"], None)
+        # Decode only the reminders that are still live.
+        reminders = {identifier: Reminder.from_json(payload) for identifier, payload in payloads.items()}
+        self._records = records
+        self._live = len(reminders)
+        if torn:
+            # Drop the partial line so later appends start on a fresh line.
+            self._rewrite(*_encode_snapshot(reminders.values()))
+        return reminders
+
+    def _migrate_legacy(self, data: bytes) -> Dict[str, Reminder]:
+        """Convert a file written by the old JSON-array store into the log format."""
+
+        items = _loads(data)
+        if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+            raise ValueError(f"Tệp nhắc nhở không hợp lệ: {self._storage_path}.")
+        reminders = {reminder.identifier: reminder for reminder in map(Reminder.from_json, items)}
+        self._rewrite(*_encode_snapshot(reminders.values()))
+        return reminders
+
+    def _rewrite(self, data: bytes, count: int) -> None:
+        # Write to a sibling file and rename it over the log so a crash mid-write
+        # leaves either the old or the new log, never a truncated one.
+        tmp_path = self._storage_path.with_suffix(self._storage_path.suffix + ".tmp")
+        with tmp_path.open("wb") as handle:
+            handle.write(data)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, self._storage_path)
+        self._records = count
+        self._live = count
+
+    def _write_record(self, record: dict, live_delta: int) -> None:
+        line = _dumps(record) + b"\n"
         with self._lock:
-            serialized = [reminder.to_json() for reminder in reminders]
-            self._storage_path.write_text(json.dumps(serialized, ensure_ascii=False, indent=2), encoding="utf-8")
+            with self._storage_path.open("ab") as handle:
+                handle.write(line)
+                handle.flush()
+                os.fsync(handle.fileno())
+            self._records += 1
+            self._live = max(0, self._live + live_delta)
+
+
+# Longest single wait while reminders are pending. Condition.wait() runs on the
+# monotonic clock, which ignores wall-clock corrections and stops during suspend,
+# so the loop re-reads the wall clock at least this often.
+_MAX_WAIT = 60.0
+
+
+def _due_timestamp(reminder: Reminder) -> float:
+    """Return a reminder's wall-clock due time as a POSIX timestamp."""
+
+    return reminder.due_time.timestamp()
 
 
 class ReminderScheduler:
@@ -83,10 +258,25 @@ class ReminderScheduler:
         self._store = store
         self._display_callback = display_callback
         self._speak_callback = speak_callback
+        # Kept for backwards compatibility; the loop now waits on the next due time.
         self._poll_resolution = poll_resolution
         self._stop = threading.Event()
         self._condition = threading.Condition()
-        self._reminders: List[Reminder] = sorted(self._store.load())
+        # Min-heap of (due timestamp, sequence, reminder); the sequence breaks ties so
+        # that reminders themselves are never compared, and identifies each entry.
+        # Removed entries are only recorded in ``_cancelled`` by sequence number and
+        # discarded lazily when they reach the top, so a reminder re-added under the
+        # same identifier is never mistaken for the entry it replaced.
+        self._seq = itertools.count()
+        self._heap: List[Tuple[float, int, Reminder]] = [
+            (_due_timestamp(reminder), next(self._seq), reminder) for reminder in self._store.load()
+        ]
+        heapq.heapify(self._heap)
+        self._by_id: Dict[str, Tuple[float, int, Reminder]] = {entry[2].identifier: entry for entry in self._heap}
+        self._cancelled: Set[int] = set()
+        # Sorted copy of the schedule for upcoming(). Writers reset it to None under the
+        # condition; readers use it without locking until the next change.
+        self._snapshot: Optional[Tuple[Reminder, ...]] = None
         self._thread = threading.Thread(target=self._run_loop, name="reminder-scheduler", daemon=True)
         self._thread.start()
 
@@ -97,49 +287,139 @@ class ReminderScheduler:
         self._thread.join()
 
     def add_reminder(self, reminder: Reminder) -> Reminder:
+        # Persist before publishing so the log's add record always precedes any
+        # del/fire record, and so the disk write never runs under the condition.
+        self._store.append(reminder)
         with self._condition:
-            self._reminders.append(reminder)
-            self._reminders.sort()
-            self._store.save(self._reminders)
+            entry = (_due_timestamp(reminder), next(self._seq), reminder)
+            heapq.heappush(self._heap, entry)
+            # Adding an identifier that is already scheduled replaces that entry, matching
+            # the log, where the later add record wins on replay.
+            replaced = self._by_id.get(reminder.identifier)
+            if replaced is not None:
+                self._cancelled.add(replaced[1])
+            self._by_id[reminder.identifier] = entry
+            self._snapshot = None
             self._condition.notify_all()
         return reminder
 
     def upcoming(self) -> List[Reminder]:
-        with self._condition:
-            return list(self._reminders)
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._condition:
+                snapshot = self._snapshot
+                if snapshot is None:
+                    snapshot = tuple(
+                        reminder
+                        for _, seq, reminder in sorted(self._heap)
+                        if seq not in self._cancelled
+                    )
+                    self._snapshot = snapshot
+        return list(snapshot)
 
     def remove_reminder(self, identifier: str) -> Optional[Reminder]:
         with self._condition:
-            for idx, reminder in enumerate(self._reminders):
-                if reminder.identifier == identifier:
-                    removed = self._reminders.pop(idx)
-                    self._store.save(self._reminders)
-                    self._condition.notify_all()
-                    return removed
-        return None
+            entry = self._by_id.pop(identifier, None)
+            if entry is None:
+                return None
+            removed = entry[2]
+            self._cancelled.add(entry[1])
+            self._snapshot = None
+            self._condition.notify_all()
+        self._store.remove(identifier)
+        self._store.compact()
+        return removed
 
     def _run_loop(self) -> None:
         while not self._stop.is_set():
-            now = dt.datetime.now()
+            now = time.time()
             due: Optional[Reminder] = None
 
             with self._condition:
-                if self._reminders and self._reminders[0].due_time <= now:
-                    due = self._reminders.pop(0)
-                    self._store.save(self._reminders)
+                # Re-check under the lock: a stop() that notified between the loop
+                # condition and here would otherwise be missed by an untimed wait.
+                if self._stop.is_set():
+                    break
+                while self._heap and self._heap[0][1] in self._cancelled:
+                    self._cancelled.discard(heapq.heappop(self._heap)[1])
+                if self._heap and self._heap[0][0] <= now:
+                    entry = heapq.heappop(self._heap)
+                    due = entry[2]
+                    if self._by_id.get(due.identifier) is entry:
+                        del self._by_id[due.identifier]
+                    self._snapshot = None
                 else:
-                    timeout = self._poll_resolution
-                    if self._reminders:
-                        delta = (self._reminders[0].due_time - now).total_seconds()
-                        timeout = max(0.0, min(delta, self._poll_resolution))
+                    # Sleep until the next reminder is due, or indefinitely when there is
+                    # nothing scheduled; add/remove/stop all notify the condition.
+                    timeout = None
+                    if self._heap:
+                        timeout = min(max(0.0, self._heap[0][0] - now), _MAX_WAIT)
                     self._condition.wait(timeout=timeout)
                     continue
 
             if due is not None:
+                # Persist outside the condition so disk I/O never blocks other callers.
+                self._store.mark_fired(due.identifier)
+                self._store.compact()
                 self._display_callback(due)
                 self._speak_callback(due)
 
 
+def _skip_spaces(text: str, pos: int) -> int:
+    while pos < len(text) and text[pos].isspace():
+        pos += 1
+    return pos
+
+
+def _scan_digits(text: str, pos: int) -> int:
+    """Return the end of a run of at most two decimal digits starting at ``pos``."""
+
+    end = pos
+    while end < len(text) and end - pos < 2 and text[end].isdecimal():
+        end += 1
+    return end
+
+
+def _parse_time_fragment(text: str, start: int = 0) -> Optional[Tuple[int, int, int, int]]:
+    """Locate the time fragment of a lowercased command in a single forward scan.
+
+    Returns ``(hour, minute, fragment_start, fragment_end)`` or ``None`` when no
+    fragment is found. The first ``lúc`` followed by one or two digits wins; it is
+    read as ``HH:MM`` when possible and otherwise as ``HH [giờ|h] [MM]``.
+    """
+
+    pos = text.find("lúc", start)
+    while pos != -1:
+        hour_start = _skip_spaces(text, pos + 3)
+        hour_end = _scan_digits(text, hour_start)
+        if hour_end == hour_start:
+            pos = text.find("lúc", pos + 1)
+            continue
+        hour = int(text[hour_start:hour_end])
+
+        colon = _skip_spaces(text, hour_end)
+        if colon < len(text) and text[colon] == ":":
+            minute_start = _skip_spaces(text, colon + 1)
+            minute_end = _scan_digits(text, minute_start)
+            if minute_end > minute_start:
+                return hour, int(text[minute_start:minute_end]), pos, minute_end
+
+        end = hour_end
+        unit = _skip_spaces(text, end)
+        if text.startswith("giờ", unit):
+            end = unit + 3
+        elif text.startswith("h", unit):
+            end = unit + 1
+        minute = 0
+        minute_start = _skip_spaces(text, end)
+        minute_end = _scan_digits(text, minute_start)
+        if minute_end > minute_start:
+            minute = int(text[minute_start:minute_end])
+            end = minute_end
+        return hour, minute, pos, end
+    return None
+
+
 def parse_vietnamese_reminder(command: str, reference: Optional[dt.datetime] = None) -> Reminder:
     """Parse a simple Vietnamese reminder phrase.
 
@@ -162,44 +442,40 @@ def parse_vietnamese_reminder(command: str, reference: Optional[dt.datetime] = N
         If the command cannot be parsed.
     """
 
+    if len(command) > _MAX_COMMAND_LENGTH:
+        raise ValueError("Câu lệnh quá dài.")
+
     reference = reference or dt.datetime.now()
-    normalized = command.lower().strip()
+    normalized = command.lower()
+    if len(normalized) != len(command):
+        # Lowercasing changed the length (rare non-Vietnamese characters), so offsets
+        # into ``normalized`` would not line up with ``command``; use the lowered text.
+        command = normalized
 
-    if "nhắc nhở tôi" not in normalized:
+    if _PREFIX not in normalized:
         raise ValueError("Không tìm thấy cụm 'nhắc nhở tôi' trong câu lệnh.")
-    colon_match = re.search(r"lúc\s*(\d{1,2})\s*[:]\s*(\d{1,2})", normalized)
-    if colon_match:
-        hour = int(colon_match.group(1))
-        minute = int(colon_match.group(2))
-        time_fragment = colon_match.group(0)
-    else:
-        simple_match = re.search(
-            r"lúc\s*(\d{1,2})(?:\s*(?:giờ|h))?(?:\s*(\d{1,2}))?",
-            normalized,
-        )
-        if not simple_match:
-            raise ValueError("Không tìm thấy thời gian hợp lệ trong câu lệnh.")
-        hour = int(simple_match.group(1))
-        minute = int(simple_match.group(2) or 0)
-        time_fragment = simple_match.group(0)
+    if "lúc" not in normalized:
+        raise ValueError("Không tìm thấy thời gian hợp lệ trong câu lệnh.")
+    parsed = _parse_time_fragment(normalized)
+    if parsed is None:
+        raise ValueError("Không tìm thấy thời gian hợp lệ trong câu lệnh.")
+    hour, minute, fragment_start, fragment_end = parsed
 
     if not 0 <= hour <= 23:
         raise ValueError("Giờ không hợp lệ.")
     if not 0 <= minute <= 59:
         raise ValueError("Phút không hợp lệ.")
 
-    start_index = normalized.index("nhắc nhở tôi") + len("nhắc nhở tôi")
-    message_original = command[start_index:]
-    message_lower = message_original.lower()
-    fragment_lower = time_fragment.lower()
-    fragment_pos = message_lower.find(fragment_lower)
-    if fragment_pos != -1:
-        message_original = (
-            message_original[:fragment_pos] + message_original[fragment_pos + len(time_fragment):]
-        )
+    # Offsets found in ``normalized`` apply directly to ``command``, so the message is
+    # cut out of the original text without lowercasing it a second time.
+    start_index = normalized.index(_PREFIX) + len(_PREFIX)
+    if fragment_start >= start_index:
+        message_original = command[start_index:fragment_start] + command[fragment_end:]
+    else:
+        message_original = command[start_index:]
 
-    message = re.sub(r"\blúc\b", "", message_original, flags=re.IGNORECASE).strip(" ,.:-")
-    message = re.sub(r"\s{2,}", " ", message).strip()
+    message = _LUC_RE.sub("", message_original).strip(" ,.:-")
+    message = " ".join(message.split())
     if message:
         message = message[0].upper() + message[1:]
 
@@ -217,13 +493,25 @@ def default_display(reminder: Reminder) -> None:
     print(f"[DISPLAY] {reminder.message} - đến giờ rồi!")
 
 
+_speak_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=1)
+def _get_engine():
+    """Initialise the pyttsx3 engine once; loading voices is slow."""
+
+    import pyttsx3
+
+    return pyttsx3.init()
+
+
 def default_speak(reminder: Reminder) -> None:
     try:
-        import pyttsx3
-
-        engine = pyttsx3.init()
-        engine.say(reminder.message)
-        engine.runAndWait()
+        # pyttsx3 engines are not thread-safe, so serialise access to the shared one.
+        with _speak_lock:
+            engine = _get_engine()
+            engine.say(reminder.message)
+            engine.runAndWait()
     except Exception as exc:  # pragma: no cover - fallback path when pyttsx3 missing
         print(f"[SPEAK] {reminder.message} (không thể phát giọng nói: {exc})")
 